@@ -389,20 +389,19 @@ def get_percentiles():
 
         from db import get_db_connection
 
-        conn = get_db_connection()
-        cursor = conn.cursor()
-
-        percentiles = {}
-        for p in [10, 25, 50, 75, 90, 95, 99]:
-            cursor.execute(f"""
-                SELECT PERCENTILE_CONT({p/100.0}) WITHIN GROUP (ORDER BY amount_pal) as p{p}
-                FROM migrations
-            """)
-            result = cursor.fetchone()
-            percentiles[f"p{p}"] = float(result[f'p{p}']) if result and result[f'p{p}'] else 0
-
-        cursor.close()
-        conn.close()
+        with get_db_connection() as conn:
+            cursor = conn.cursor()
+
+            percentiles = {}
+            for p in [10, 25, 50, 75, 90, 95, 99]:
+                cursor.execute(f"""
+                    SELECT PERCENTILE_CONT({p/100.0}) WITHIN GROUP (ORDER BY amount_pal) as p{p}
+                    FROM migrations
+                """)
+                result = cursor.fetchone()
+                percentiles[f"p{p}"] = float(result[f'p{p}']) if result and result[f'p{p}'] else 0
+
+            cursor.close()
 
         return jsonify(percentiles)
     except Exception as e:
@@ -12,9 +12,10 @@ import sys
 import sqlite3
 import psycopg2
 from psycopg2.extras import execute_batch
-from datetime import datetime
 import argparse
 
+from row_builder import build_rows
+
 # Get script directory for platform-independent paths
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 SQLITE_DB = os.path.join(SCRIPT_DIR, "..", "data", "migrations.db")
@@ -46,7 +47,6 @@ def migrate_data(force_delete=False, dry_run=False):
             sys.exit(1)
 
         sqlite_conn = sqlite3.connect(SQLITE_DB)
-        sqlite_conn.row_factory = sqlite3.Row
         sqlite_cursor = sqlite_conn.cursor()
 
         # Connect to Postgres
@@ -96,8 +96,16 @@ def migrate_data(force_delete=False, dry_run=False):
         else:
             print("\n✓ Running in safe mode - will skip duplicates (ON CONFLICT DO NOTHING)")
 
+        # Drop rows Postgres already has so they never reach the server
+        to_insert = migrations
+        if not force_delete and existing_count > 0:
+            pg_cursor.execute("SELECT tx_hash FROM migrations")
+            existing_hashes = {r[0] for r in pg_cursor}
+            to_insert = [r for r in migrations if r[0] not in existing_hashes]
+            print(f"✓ Skipping {len(migrations) - len(to_insert)} migrations already in Postgres")
+
         # Prepare data for batch insert
-        print(f"\nInserting {len(migrations)} migrations into Postgres...")
+        print(f"\nInserting {len(to_insert)} migrations into Postgres...")
         insert_query = """
             INSERT INTO migrations
             (tx_hash, from_address, to_address, amount_pal, block_number,
@@ -106,38 +114,12 @@ def migrate_data(force_delete=False, dry_run=False):
             ON CONFLICT (tx_hash) DO NOTHING
         """
 
-        data = []
-        failed_parses = 0
-
-        for row in migrations:
-            # Parse timestamp string back to datetime object
-            timestamp_str = row['timestamp']
-            timestamp = None
-
-            if timestamp_str:
-                try:
-                    # Handle ISO format timestamps
-                    timestamp = datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
-                except (ValueError, AttributeError) as e:
-                    failed_parses += 1
-                    if failed_parses <= 3:  # Only show first 3 errors
-                        print(f"  Warning: Failed to parse timestamp '{timestamp_str}': {e}")
-                    timestamp = None
-
-            data.append((
-                row['tx_hash'],
-                row['from_address'],
-                row['to_address'],
-                float(row['amount_pal']),
-                row['block_number'],
-                row['block_timestamp'],
-                timestamp,
-                row['log_index'],
-                row['source'] or 'unknown'
-            ))
-
-        if failed_parses > 3:
-            print(f"  ... and {failed_parses - 3} more timestamp parse warnings")
+        data, failed_parses = build_rows(to_insert)
+
+        for timestamp_str, error in failed_parses[:3]:  # Only show first 3 errors
+            print(f"  Warning: Failed to parse timestamp '{timestamp_str}': {error}")
+        if len(failed_parses) > 3:
+            print(f"  ... and {len(failed_parses) - 3} more timestamp parse warnings")
 
         # Batch insert
         execute_batch(pg_cursor, insert_query, data, page_size=100)
@@ -0,0 +1,49 @@
+"""
+Row builder for the SQLite to Postgres migration
+
+Kept as plain, fully annotated functions so it can be compiled with mypyc
+(`mypyc row_builder.py`) for large one-shot migrations. Without a compiled
+extension the pure-Python module is imported as usual.
+"""
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+
+Row = Tuple[Any, ...]
+
+
+def parse_timestamp(timestamp_str: Optional[str]) -> Optional[datetime]:
+    """Parse an ISO format timestamp string back to a datetime object"""
+    if not timestamp_str:
+        return None
+    return datetime.fromisoformat(timestamp_str.replace('Z', '+00:00'))
+
+
+def _parse_or_record(timestamp_str: Optional[str], failed: List[Tuple[Any, str]]) -> Optional[datetime]:
+    """Parse a timestamp, recording it in failed (and returning None) if it is unparseable"""
+    try:
+        return parse_timestamp(timestamp_str)
+    except (ValueError, AttributeError) as e:
+        failed.append((timestamp_str, str(e)))
+        return None
+
+
+def build_rows(rows: Sequence[Row]) -> Tuple[List[Row], List[Tuple[Any, str]]]:
+    """
+    Convert SQLite migration rows into Postgres insert tuples
+
+    Args:
+        rows: Tuples of (tx_hash, from_address, to_address, amount_pal, block_number,
+              block_timestamp, timestamp, log_index, source)
+
+    Returns:
+        The insert tuples, and (timestamp, error) pairs for unparseable timestamps
+    """
+    failed: List[Tuple[Any, str]] = []
+
+    # Columns follow the SELECT in migrate_data(); see Args above
+    data: List[Row] = [
+        (r[0], r[1], r[2], float(r[3]), r[4], r[5], _parse_or_record(r[6], failed), r[7], r[8] or 'unknown')
+        for r in rows
+    ]
+
+    return data, failed
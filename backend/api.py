@@ -3,26 +3,55 @@
 Flask API server for the migration dashboard
 """
 
-from flask import Flask, jsonify, request, send_file
+from flask import Blueprint, Flask, current_app, jsonify, request, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
 from datetime import datetime
 import os
+import orjson
 
 from database import MigrationDatabase
 from data_processor import MigrationDataProcessor
 from trevee_metrics import TreveeMetricsTracker
-from config import LARGE_MIGRATION_THRESHOLD
+from config import LARGE_MIGRATION_THRESHOLD, METRICS_SNAPSHOT_PATH
 
-app = Flask(__name__)
-CORS(app)  # Enable CORS for frontend
 
-# Initialize database and processor
-db = MigrationDatabase()
-processor = MigrationDataProcessor(db)
-trevee_tracker = TreveeMetricsTracker()
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON provider that serializes responses with orjson"""
 
+    option = orjson.OPT_NON_STR_KEYS
 
-@app.route("/api/health", methods=["GET"])
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        # Skip the str round-trip: orjson already produces the response bytes
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=self.option),
+            mimetype=self.mimetype
+        )
+
+
+api = Blueprint("api", __name__, url_prefix="/api")
+
+
+def _db() -> MigrationDatabase:
+    return current_app.extensions["migration_db"]
+
+
+def _processor() -> MigrationDataProcessor:
+    return current_app.extensions["migration_processor"]
+
+
+def _trevee_tracker() -> TreveeMetricsTracker:
+    return current_app.extensions["trevee_tracker"]
+
+
+@api.route("/health", methods=["GET"])
 def health_check():
     """Health check endpoint"""
     return jsonify({
@@ -31,94 +60,102 @@ def health_check():
     })
 
 
-@app.route("/api/metrics", methods=["GET"])
+@api.route("/metrics", methods=["GET"])
 def get_metrics():
     """Get all migration metrics"""
     try:
-        metrics = processor.get_all_metrics()
+        # Serve the snapshot written by sync; Flask answers 304s from its mtime
+        if os.path.exists(METRICS_SNAPSHOT_PATH):
+            return send_file(
+                os.path.abspath(METRICS_SNAPSHOT_PATH),
+                mimetype="application/json",
+                conditional=True
+            )
+
+        metrics = _processor().get_all_metrics()
         return jsonify(metrics)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/statistics", methods=["GET"])
+@api.route("/statistics", methods=["GET"])
 def get_statistics():
     """Get summary statistics"""
     try:
-        stats = db.get_statistics()
+        stats = _db().get_statistics()
         return jsonify(stats)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/daily-stats", methods=["GET"])
+@api.route("/daily-stats", methods=["GET"])
 def get_daily_stats():
     """Get daily migration statistics"""
     try:
-        stats = db.get_daily_stats()
+        stats = _db().get_daily_stats()
         return jsonify(stats)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/migration-rate", methods=["GET"])
+@api.route("/migration-rate", methods=["GET"])
 def get_migration_rate():
     """Get migration rate for specified period"""
     try:
         days = request.args.get("days", 7, type=int)
-        rate = processor.calculate_migration_rate(days)
+        rate = _processor().calculate_migration_rate(days)
         return jsonify(rate)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/timeline", methods=["GET"])
+@api.route("/timeline", methods=["GET"])
 def get_timeline():
     """Get complete migration timeline"""
     try:
-        timeline = processor.get_migration_timeline()
+        timeline = _processor().get_migration_timeline()
         return jsonify(timeline)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/address/<address>", methods=["GET"])
+@api.route("/address/<address>", methods=["GET"])
 def lookup_address(address):
     """Look up migrations for a specific address"""
     try:
-        result = processor.get_address_lookup(address)
+        result = _processor().get_address_lookup(address)
         return jsonify(result)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/large-migrations", methods=["GET"])
+@api.route("/large-migrations", methods=["GET"])
 def get_large_migrations():
     """Get migrations above threshold"""
     try:
         threshold = request.args.get("threshold", LARGE_MIGRATION_THRESHOLD, type=float)
-        migrations = processor.detect_large_migrations(threshold)
+        migrations = _processor().detect_large_migrations(threshold)
         return jsonify(migrations)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/percentiles", methods=["GET"])
+@api.route("/percentiles", methods=["GET"])
 def get_percentiles():
     """Get percentile distribution"""
     try:
-        percentiles = processor.calculate_percentiles()
+        percentiles = _processor().calculate_percentiles()
         return jsonify(percentiles)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/export/json", methods=["GET"])
+@api.route("/export/json", methods=["GET"])
 def export_json():
     """Export all migrations as JSON"""
     try:
         filepath = "../data/export.json"
-        db.export_to_json(filepath)
+        _db().export_to_json(filepath)
 
         return send_file(
             filepath,
@@ -130,12 +167,12 @@ def export_json():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/export/csv", methods=["GET"])
+@api.route("/export/csv", methods=["GET"])
 def export_csv():
     """Export all migrations as CSV"""
     try:
         filepath = "../data/export.csv"
-        db.export_to_csv(filepath)
+        _db().export_to_csv(filepath)
 
         return send_file(
             filepath,
@@ -147,11 +184,11 @@ def export_csv():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/sync-status", methods=["GET"])
+@api.route("/sync-status", methods=["GET"])
 def get_sync_status():
     """Get synchronization status"""
     try:
-        last_block = db.get_last_synced_block()
+        last_block = _db().get_last_synced_block()
 
         return jsonify({
             "last_synced_block": last_block,
@@ -161,40 +198,66 @@ def get_sync_status():
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/trevee/metrics", methods=["GET"])
+@api.route("/trevee/metrics", methods=["GET"])
 def get_trevee_metrics():
     """Get all Trevee multi-chain metrics"""
     try:
-        metrics = trevee_tracker.get_all_metrics()
+        metrics = _trevee_tracker().get_all_metrics()
         return jsonify(metrics)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/trevee/tvl", methods=["GET"])
+@api.route("/trevee/tvl", methods=["GET"])
 def get_trevee_tvl():
     """Get TVL breakdown by chain"""
     try:
-        tvl_data = trevee_tracker.get_tvl_by_chain()
+        tvl_data = _trevee_tracker().get_tvl_by_chain()
         return jsonify(tvl_data)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-@app.route("/api/trevee/staking", methods=["GET"])
+@api.route("/trevee/staking", methods=["GET"])
 def get_trevee_staking():
     """Get staking statistics"""
     try:
-        staking_stats = trevee_tracker.get_total_staking_percentage()
+        staking_stats = _trevee_tracker().get_total_staking_percentage()
         return jsonify(staking_stats)
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
-if __name__ == "__main__":
-    # Create data directory if it doesn't exist
-    os.makedirs("../data", exist_ok=True)
+def create_app() -> Flask:
+    """
+    Create the API application
+
+    Each gunicorn worker imports this module and builds its own app, so the
+    database, processor and tracker are never shared across processes.
+    """
+    app = Flask(__name__)
+    app.json = OrjsonProvider(app)
+    CORS(app)  # Enable CORS for frontend
+
+    # Initialize database and processor
+    db = MigrationDatabase()
+    app.extensions["migration_db"] = db
+    app.extensions["migration_processor"] = MigrationDataProcessor(db)
+    app.extensions["trevee_tracker"] = TreveeMetricsTracker()
+
+    app.register_blueprint(api)
+    return app
+
 
+# Create data directory if it doesn't exist
+os.makedirs("../data", exist_ok=True)
+
+# WSGI entry point, e.g.:
+#   gunicorn -k gevent -w 4 --worker-connections 100 api:app
+app = create_app()
+
+
+if __name__ == "__main__":
     print("Starting PAL to TREVEE Migration API Server...")
     print("API available at http://localhost:5000")
     print("\nAvailable endpoints:")
@@ -211,4 +274,7 @@ if __name__ == "__main__":
     print("  GET /api/export/csv - Export as CSV")
     print("  GET /api/sync-status - Sync status")
 
-    app.run(host="0.0.0.0", port=5000, debug=True)
+    print("\nFor production use gunicorn:")
+    print("  gunicorn -k gevent -w 4 --worker-connections 100 api:app")
+
+    app.run(host="0.0.0.0", port=5000)
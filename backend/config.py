@@ -14,6 +14,7 @@ MIGRATION_CONTRACT_ADDRESS = "0x99fe40e501151e92f10ac13ea1c06083ee170363"
 
 # Database Configuration
 DB_PATH = "../data/migrations.db"
+METRICS_SNAPSHOT_PATH = "../data/metrics.json"  # Precomputed /api/metrics payload, written by sync
 
 # Dashboard Configuration
 REFRESH_INTERVAL = 300  # seconds (5 minutes)
@@ -22,8 +23,20 @@ LARGE_MIGRATION_THRESHOLD = 100000  # PAL tokens (for alerts)
 # Data Collection Settings
 START_BLOCK = 52609535  # Migration contract deployment block (Oct 10, 2025)
 BATCH_SIZE = 10000  # Number of blocks to query at once
+BLOCK_CHUNK_SIZE = 50000  # Blocks fetched, stored and checkpointed per sync step
+SYNC_CHUNK_WORKERS = 4  # Block chunks fetched in parallel during sync
+REORG_SAFETY_BLOCKS = 5  # Stay this many blocks behind head to avoid reorgs
+SYNC_INTERVAL_MIN = 60  # Shortest wait between continuous syncs (seconds)
+SYNC_INTERVAL_MAX = 600  # Longest wait between continuous syncs (seconds)
+SYNC_CATCH_UP_BLOCKS = 50000  # Sync again immediately after scanning more than this
 MAX_RETRIES = 3
 RETRY_DELAY = 2  # seconds
+RPC_BATCH_SIZE = 100  # Max calls per JSON-RPC batch request
+LOG_FETCH_WORKERS = 8  # Concurrent eth_getLogs requests when scanning
+# Keep-alive connections to the Sonic RPC: one per concurrent log fetch, plus the sync thread
+RPC_POOL_SIZE = SYNC_CHUNK_WORKERS * LOG_FETCH_WORKERS + 1
+RPC_RATE_LIMIT = 10  # Sustained RPC requests per second during sync
+RPC_BURST = 20  # Requests allowed back-to-back before throttling
 
 # Migration Deadline (set to None if not applicable)
 MIGRATION_DEADLINE = None  # Format: "2025-12-31 23:59:59" or None
@@ -84,3 +97,4 @@ TREVEE_TOTAL_SUPPLY = 50000000  # 50 million TREVEE total supply on Sonic
 
 # Update intervals for Trevee metrics
 TREVEE_METRICS_REFRESH_INTERVAL = 300  # seconds (5 minutes)
+TREVEE_RPC_CACHE_TTL = 30  # seconds to reuse fetched supply/staked amounts
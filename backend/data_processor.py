@@ -2,10 +2,32 @@
 Data processor for calculating migration metrics and analytics
 """
 
+import os
+from bisect import bisect_right
 from datetime import datetime, timedelta
+from math import fsum
+from operator import itemgetter
 from typing import Dict, List, Tuple
 import statistics
+import orjson
 from database import MigrationDatabase
+from config import METRICS_SNAPSHOT_PATH
+
+
+# Histogram bins for the migration size distribution
+_DIST_BINS = (0, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, float('inf'))
+_DIST_LABELS = (
+    "0-100",
+    "100-500",
+    "500-1K",
+    "1K-5K",
+    "5K-10K",
+    "10K-50K",
+    "50K-100K",
+    "100K-500K",
+    "500K+"
+)
+_DIST_EDGES = _DIST_BINS[:-1]  # Exclude infinity
 
 
 class MigrationDataProcessor:
@@ -16,10 +38,11 @@ class MigrationDataProcessor:
 
     def get_all_metrics(self) -> Dict:
         """Calculate all metrics for the dashboard"""
-        stats = self.db.get_statistics()
-        daily_stats = self.db.get_daily_stats()
+        bundle = self.db.get_bundle()
+        stats = bundle["statistics"]
+        daily_stats = bundle["daily_stats"]
         cumulative_data = self._calculate_cumulative_data(daily_stats)
-        distribution = self._calculate_distribution()
+        distribution = self._calculate_distribution(bundle["amounts"])
         source_breakdown = self._calculate_source_breakdown(stats)
 
         return {
@@ -38,6 +61,21 @@ class MigrationDataProcessor:
             "last_updated": datetime.now().isoformat()
         }
 
+    def write_metrics_snapshot(self, filepath: str = METRICS_SNAPSHOT_PATH):
+        """
+        Write the dashboard metrics to a JSON file
+
+        The API serves this file for /api/metrics, so metrics are only
+        recomputed when the underlying data changes.
+        """
+        metrics = self.get_all_metrics()
+
+        # Write to a temporary file first so readers never see a partial snapshot
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(orjson.dumps(metrics, option=orjson.OPT_NON_STR_KEYS))
+        os.replace(tmp_path, filepath)
+
     def _calculate_cumulative_data(self, daily_stats: List[Dict]) -> List[Dict]:
         """Calculate cumulative migrations over time"""
         cumulative = []
@@ -58,49 +96,31 @@ class MigrationDataProcessor:
 
         return cumulative
 
-    def _calculate_distribution(self) -> Dict:
+    def _calculate_distribution(self, amounts: List[float]) -> Dict:
         """Calculate distribution of migration sizes"""
-        migrations = self.db.get_all_migrations()
-
-        if not migrations:
+        if not amounts:
             return {"bins": [], "counts": []}
 
-        amounts = [m["amount_pal"] for m in migrations]
-
-        # Define bins for histogram
-        bins = [0, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, float('inf')]
-        bin_labels = [
-            "0-100",
-            "100-500",
-            "500-1K",
-            "1K-5K",
-            "5K-10K",
-            "10K-50K",
-            "50K-100K",
-            "100K-500K",
-            "500K+"
-        ]
-
-        counts = [0] * len(bin_labels)
+        counts = [0] * len(_DIST_LABELS)
 
         for amount in amounts:
-            for i in range(len(bins) - 1):
-                if bins[i] <= amount < bins[i + 1]:
-                    counts[i] += 1
-                    break
+            # Index of the last lower edge <= amount; -1 means below the first bin
+            index = bisect_right(_DIST_EDGES, amount) - 1
+            if index >= 0:
+                counts[index] += 1
 
         return {
-            "labels": bin_labels,
+            "labels": list(_DIST_LABELS),
             "counts": counts,
-            "bins": bins[:-1]  # Exclude infinity
+            "bins": list(_DIST_EDGES)
         }
 
     def _calculate_source_breakdown(self, stats: Dict) -> Dict:
         """Calculate percentage breakdown by source"""
         source_dist = stats["source_distribution"]
 
-        total_migrations = sum(s["count"] for s in source_dist)
-        total_pal = sum(s["total_pal"] for s in source_dist)
+        total_migrations = sum(map(itemgetter("count"), source_dist))
+        total_pal = fsum(map(itemgetter("total_pal"), source_dist))
 
         breakdown = {
             "sonic": {"count": 0, "pal": 0, "percentage": 0, "pal_percentage": 0},
@@ -136,8 +156,8 @@ class MigrationDataProcessor:
         # Get last N days
         recent_stats = daily_stats[-days:]
 
-        total_migrations = sum(s["migrations"] for s in recent_stats)
-        total_pal = sum(s["total_pal"] for s in recent_stats)
+        total_migrations = sum(map(itemgetter("migrations"), recent_stats))
+        total_pal = fsum(map(itemgetter("total_pal"), recent_stats))
 
         return {
             "daily_average_migrations": total_migrations / days,
@@ -158,14 +178,14 @@ class MigrationDataProcessor:
                 "migrations": []
             }
 
-        total_pal = sum(m["amount_pal"] for m in migrations)
+        total_pal = fsum(map(itemgetter("amount_pal"), migrations))
 
         return {
             "address": address,
             "found": True,
             "migration_count": len(migrations),
             "total_pal_migrated": total_pal,
-            "migrations": migrations
+            "migrations": [dict(m) for m in migrations]
         }
 
     def detect_large_migrations(self, threshold: float) -> List[Dict]:
@@ -177,7 +197,8 @@ class MigrationDataProcessor:
             if m["amount_pal"] >= threshold
         ]
 
-        return sorted(large_migrations, key=lambda x: x["amount_pal"], reverse=True)
+        large_migrations.sort(key=itemgetter("amount_pal"), reverse=True)
+        return [dict(m) for m in large_migrations]
 
     def get_migration_timeline(self) -> List[Dict]:
         """Get complete migration timeline"""
@@ -4,255 +4,485 @@ Database module for caching migration data
 
 import sqlite3
 import json
+import threading
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import Iterator, List, Dict, Optional
 from config import DB_PATH
 
 
 class MigrationDatabase:
     """SQLite database for storing migration data"""
 
+    # Hot statements, kept as constants so every call hits the connection's
+    # prepared statement cache with the same SQL string
+    # timestamp is derived from block_timestamp (?7) by SQLite, so callers
+    # never build or format a datetime per row; the Z suffix marks it as UTC
+    # for clients that would otherwise read it as local time
+    _INSERT_SQL = """
+        INSERT OR REPLACE INTO migrations
+        (tx_hash, from_address, to_address, amount, amount_pal,
+         block_number, block_timestamp, timestamp, log_index, source)
+        VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7,
+                strftime('%Y-%m-%dT%H:%M:%SZ', ?7, 'unixepoch'), ?8, ?9)
+    """
+
+    # Only columns held by idx_from_address_cover, so lookups never touch the table
+    _SELECT_BY_ADDRESS_SQL = """
+        SELECT from_address, block_number, amount_pal, tx_hash
+        FROM migrations
+        WHERE from_address = ?
+        ORDER BY block_number ASC
+    """
+
+    # amount is the raw wei value as a decimal string: migrations above
+    # ~9.22 PAL exceed SQLite's 64-bit INTEGER
+    _CREATE_MIGRATIONS_SQL = """
+        CREATE TABLE IF NOT EXISTS migrations (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            tx_hash TEXT UNIQUE NOT NULL,
+            from_address TEXT NOT NULL,
+            to_address TEXT NOT NULL,
+            amount TEXT NOT NULL,
+            amount_pal REAL NOT NULL,
+            block_number INTEGER NOT NULL,
+            block_timestamp INTEGER,
+            timestamp TEXT,
+            log_index INTEGER,
+            source TEXT DEFAULT 'unknown',
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    """
+
+    _SELECT_ALL_SQL = """
+        SELECT * FROM migrations
+        ORDER BY block_number ASC, log_index ASC
+    """
+
+    _LAST_SYNCED_BLOCK_SQL = "SELECT last_synced_block FROM sync_metadata WHERE id = 1"
+
+    # Totals are kept in sync_metadata so statistics reads never scan
+    # migrations; each write transaction adds the delta of its own rows
+    _ADD_TOTALS_SQL = """
+        UPDATE sync_metadata
+        SET total_migrations = total_migrations + ?,
+            total_pal_migrated = total_pal_migrated + ?
+        WHERE id = 1
+    """
+
+    # Max tx hashes per IN (...) lookup, well under SQLite's variable limit
+    _LOOKUP_CHUNK_SIZE = 500
+
+    # Bumped whenever init_database() gains a one-time data backfill
+    SCHEMA_VERSION = 3
+
     def __init__(self, db_path: str = DB_PATH):
         self.db_path = db_path
+
+        # One long-lived connection shared by all methods; the lock keeps
+        # threads from interleaving statements or transactions on it
+        self._conn = sqlite3.connect(self.db_path, check_same_thread=False, cached_statements=512)
+        self._conn.row_factory = sqlite3.Row  # Return rows as dictionaries
+        self._lock = threading.RLock()
+
         self.init_database()
 
     def get_connection(self):
-        """Get database connection"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row  # Return rows as dictionaries
-        return conn
+        """Get the shared database connection"""
+        return self._conn
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._conn.close()
 
     def init_database(self):
         """Initialize database schema"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            # WAL lets the API read while sync writes, and with NORMAL
+            # synchronous commits no longer fsync on every transaction
+            cursor.executescript("""
+                PRAGMA journal_mode = WAL;
+                PRAGMA synchronous = NORMAL;
+                PRAGMA temp_store = MEMORY;
+                PRAGMA mmap_size = 268435456;
+                PRAGMA cache_size = -65536;
+            """)
+
+            # Migrations table
+            cursor.execute(self._CREATE_MIGRATIONS_SQL)
+
+            # amount used to be INTEGER, which overflows above 2^63 wei (~9.22 PAL);
+            # rebuild older tables with amount as TEXT before indexing them
+            columns = {row["name"]: row["type"] for row in cursor.execute("PRAGMA table_info(migrations)")}
+            if columns["amount"].upper() == "INTEGER":
+                cursor.execute("BEGIN IMMEDIATE")
+                cursor.execute("ALTER TABLE migrations RENAME TO migrations_old")
+                cursor.execute(self._CREATE_MIGRATIONS_SQL)
+                cursor.execute(f"""
+                    INSERT INTO migrations ({", ".join(columns)})
+                    SELECT {", ".join(columns)} FROM migrations_old
+                """)
+                cursor.execute("DROP TABLE migrations_old")
+                conn.commit()
+
+            # Create indexes for performance
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_block_number
+                ON migrations(block_number)
+            """)
 
-        # Migrations table
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS migrations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                tx_hash TEXT UNIQUE NOT NULL,
-                from_address TEXT NOT NULL,
-                to_address TEXT NOT NULL,
-                amount INTEGER NOT NULL,
-                amount_pal REAL NOT NULL,
-                block_number INTEGER NOT NULL,
-                block_timestamp INTEGER,
-                timestamp TEXT,
-                log_index INTEGER,
-                source TEXT DEFAULT 'unknown',
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_timestamp
+                ON migrations(block_timestamp)
+            """)
 
-        # Create indexes for performance
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_from_address
-            ON migrations(from_address)
-        """)
+            # Lets the median OFFSET and top-N queries walk the index instead of sorting
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_amount_pal
+                ON migrations(amount_pal)
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_block_number
-            ON migrations(block_number)
-        """)
+            # Covering index for address lookups
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_from_address_cover
+                ON migrations(from_address, block_number, amount_pal, tx_hash)
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_timestamp
-            ON migrations(block_timestamp)
-        """)
+            # Its from_address prefix makes the old single-column index redundant
+            cursor.execute("DROP INDEX IF EXISTS idx_from_address")
 
-        # Metadata table for tracking sync status
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS sync_metadata (
-                id INTEGER PRIMARY KEY CHECK (id = 1),
-                last_synced_block INTEGER,
-                last_sync_time TEXT,
-                total_migrations INTEGER DEFAULT 0,
-                total_pal_migrated REAL DEFAULT 0
-            )
-        """)
+            # Expression index matching the daily stats GROUP BY
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_daily
+                ON migrations(DATE(timestamp))
+            """)
 
-        # Insert default metadata if not exists
-        cursor.execute("""
-            INSERT OR IGNORE INTO sync_metadata (id, last_synced_block, last_sync_time)
-            VALUES (1, 0, NULL)
-        """)
+            # Metadata table for tracking sync status
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sync_metadata (
+                    id INTEGER PRIMARY KEY CHECK (id = 1),
+                    last_synced_block INTEGER,
+                    last_sync_time TEXT,
+                    total_migrations INTEGER DEFAULT 0,
+                    total_pal_migrated REAL DEFAULT 0,
+                    deployment_block INTEGER,
+                    deployment_contract TEXT,
+                    schema_version INTEGER DEFAULT 0
+                )
+            """)
+
+            # Add columns introduced after the table was first created
+            columns = {row["name"] for row in cursor.execute("PRAGMA table_info(sync_metadata)")}
+            for column, column_type in (
+                ("deployment_block", "INTEGER"),
+                ("deployment_contract", "TEXT"),
+                ("schema_version", "INTEGER DEFAULT 0")
+            ):
+                if column not in columns:
+                    cursor.execute(f"ALTER TABLE sync_metadata ADD COLUMN {column} {column_type}")
+
+            # Insert default metadata if not exists
+            cursor.execute("""
+                INSERT OR IGNORE INTO sync_metadata (id, last_synced_block, last_sync_time)
+                VALUES (1, 0, NULL)
+            """)
 
-        # Snapshots table for historical tracking
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS daily_snapshots (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                snapshot_date TEXT UNIQUE NOT NULL,
-                total_migrations INTEGER,
-                total_pal_migrated REAL,
-                unique_addresses INTEGER,
-                average_migration_size REAL,
-                median_migration_size REAL,
-                created_at TEXT DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
+            cursor.execute("SELECT schema_version FROM sync_metadata WHERE id = 1")
+            schema_version = cursor.fetchone()["schema_version"] or 0
+
+            if schema_version < 1:
+                # Backfill totals once for databases written before they were maintained
+                cursor.execute("""
+                    UPDATE sync_metadata
+                    SET total_migrations = (SELECT COUNT(*) FROM migrations),
+                        total_pal_migrated = (SELECT TOTAL(amount_pal) FROM migrations)
+                    WHERE id = 1
+                """)
+
+            if schema_version < 3:
+                # Rows written before timestamps were derived in SQL hold local
+                # time (or, at version 2, UTC without the Z suffix); rewrite
+                # them in marked UTC so daily stats use one timezone
+                cursor.execute("""
+                    UPDATE migrations
+                    SET timestamp = strftime('%Y-%m-%dT%H:%M:%SZ', block_timestamp, 'unixepoch')
+                    WHERE block_timestamp IS NOT NULL
+                """)
+
+            if schema_version < self.SCHEMA_VERSION:
+                cursor.execute(
+                    "UPDATE sync_metadata SET schema_version = ? WHERE id = 1",
+                    (self.SCHEMA_VERSION,)
+                )
+
+            # Snapshots table for historical tracking
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS daily_snapshots (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    snapshot_date TEXT UNIQUE NOT NULL,
+                    total_migrations INTEGER,
+                    total_pal_migrated REAL,
+                    unique_addresses INTEGER,
+                    average_migration_size REAL,
+                    median_migration_size REAL,
+                    created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+            conn.commit()
+
+    def clear(self):
+        """
+        Delete all migrations, snapshots and sync state
+
+        Tables are emptied on the open connection rather than by deleting the
+        file, which other connections (and the WAL files) may still be using.
+        """
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("DELETE FROM migrations")
+            cursor.execute("DELETE FROM daily_snapshots")
+            cursor.execute("DELETE FROM sync_metadata")
+            conn.commit()
+
+        # Recreate the default sync metadata row
+        self.init_database()
 
-        conn.commit()
-        conn.close()
+    @staticmethod
+    def _migration_row(migration: Dict) -> tuple:
+        """Convert a migration dict into an insert parameter tuple"""
+        return (
+            migration.get("tx_hash"),
+            migration.get("from_address"),
+            migration.get("to_address"),
+            str(migration["amount"]) if migration.get("amount") is not None else None,
+            migration.get("amount_pal"),
+            migration.get("block_number"),
+            migration.get("block_timestamp"),
+            migration.get("log_index"),
+            migration.get("source", "unknown")
+        )
+
+    def _totals_delta(self, cursor, rows: List[tuple]) -> tuple:
+        """
+        Get the (count, PAL) change inserting rows will make to the totals
+
+        Must run in the write transaction, before the insert. INSERT OR REPLACE
+        keeps the last row for each tx hash and drops any stored one, so the
+        stored amounts of those hashes are subtracted.
+        """
+        amounts = {row[0]: row[4] for row in rows}
+        count = len(amounts)
+        pal = sum(amounts.values())
+
+        tx_hashes = list(amounts)
+        for i in range(0, len(tx_hashes), self._LOOKUP_CHUNK_SIZE):
+            chunk = tx_hashes[i:i + self._LOOKUP_CHUNK_SIZE]
+            cursor.execute(f"""
+                SELECT COUNT(*), TOTAL(amount_pal) FROM migrations
+                WHERE tx_hash IN ({",".join("?" * len(chunk))})
+            """, chunk)
+            replaced, replaced_pal = cursor.fetchone()
+            count -= replaced
+            pal -= replaced_pal
+
+        return count, pal
 
     def insert_migration(self, migration: Dict) -> bool:
         """Insert a migration record"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        try:
-            cursor.execute("""
-                INSERT OR REPLACE INTO migrations
-                (tx_hash, from_address, to_address, amount, amount_pal,
-                 block_number, block_timestamp, timestamp, log_index, source)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                migration.get("tx_hash"),
-                migration.get("from_address"),
-                migration.get("to_address"),
-                migration.get("amount"),
-                migration.get("amount_pal"),
-                migration.get("block_number"),
-                migration.get("block_timestamp"),
-                migration.get("timestamp").isoformat() if migration.get("timestamp") else None,
-                migration.get("log_index"),
-                migration.get("source", "unknown")
-            ))
+            try:
+                row = self._migration_row(migration)
 
-            conn.commit()
-            return True
+                cursor.execute("BEGIN IMMEDIATE")
+                delta = self._totals_delta(cursor, [row])
+                cursor.execute(self._INSERT_SQL, row)
+                cursor.execute(self._ADD_TOTALS_SQL, delta)
 
-        except Exception as e:
-            print(f"Error inserting migration: {e}")
-            conn.rollback()
-            return False
+                conn.commit()
+                return True
 
-        finally:
-            conn.close()
+            except Exception as e:
+                print(f"Error inserting migration: {e}")
+                conn.rollback()
+                return False
 
     def insert_migrations_batch(self, migrations: List[Dict]) -> int:
-        """Insert multiple migrations in batch"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        inserted = 0
+        """
+        Insert multiple migrations in batch
+
+        Raises the database error after rolling back, so a failed batch is
+        never mistaken for an empty one.
+        """
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            try:
+                rows = [self._migration_row(migration) for migration in migrations]
+
+                # Take the write lock up front and insert every row in one transaction
+                cursor.execute("BEGIN IMMEDIATE")
+                delta = self._totals_delta(cursor, rows)
+                cursor.executemany(self._INSERT_SQL, rows)
+                inserted = cursor.rowcount
+                cursor.execute(self._ADD_TOTALS_SQL, delta)
+
+                conn.commit()
+                return inserted
+
+            except Exception as e:
+                print(f"Error inserting migrations batch: {e}")
+                conn.rollback()
+                raise
+
+    def get_all_migrations(self) -> List[sqlite3.Row]:
+        """Get all migrations"""
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        try:
-            for migration in migrations:
-                cursor.execute("""
-                    INSERT OR REPLACE INTO migrations
-                    (tx_hash, from_address, to_address, amount, amount_pal,
-                     block_number, block_timestamp, timestamp, log_index, source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    migration.get("tx_hash"),
-                    migration.get("from_address"),
-                    migration.get("to_address"),
-                    migration.get("amount"),
-                    migration.get("amount_pal"),
-                    migration.get("block_number"),
-                    migration.get("block_timestamp"),
-                    migration.get("timestamp").isoformat() if migration.get("timestamp") else None,
-                    migration.get("log_index"),
-                    migration.get("source", "unknown")
-                ))
-                inserted += 1
+            cursor.execute(self._SELECT_ALL_SQL)
+            migrations = cursor.fetchall()
 
-            conn.commit()
-            return inserted
+        return migrations
 
-        except Exception as e:
-            print(f"Error inserting migrations batch: {e}")
-            conn.rollback()
-            return 0
+    def iter_migrations(self, batch_size: int = 1000) -> Iterator[sqlite3.Row]:
+        """
+        Iterate over all migrations, fetching batch_size rows at a time
 
-        finally:
-            conn.close()
+        Rows are yielded as sqlite3.Row (read by column name) rather than
+        copied into dicts; callers convert only what they return to clients.
+        Meant for streaming exports: the rows come from a short-lived read
+        connection of their own (WAL lets it read alongside writes), so a
+        long export never holds the shared connection's lock.
+        """
+        conn = sqlite3.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
 
-    def get_all_migrations(self) -> List[Dict]:
-        """Get all migrations"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = batch_size
 
-        cursor.execute("""
-            SELECT * FROM migrations
-            ORDER BY block_number ASC, log_index ASC
-        """)
+            cursor.execute(self._SELECT_ALL_SQL)
 
-        migrations = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+            while True:
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
 
-        return migrations
+                yield from rows
+        finally:
+            conn.close()
 
-    def get_migrations_by_address(self, address: str) -> List[Dict]:
+    def get_migrations_by_address(self, address: str) -> List[sqlite3.Row]:
         """Get migrations for a specific address"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT * FROM migrations
-            WHERE from_address = ?
-            ORDER BY block_number ASC
-        """, (address.lower(),))
+            cursor.execute(self._SELECT_BY_ADDRESS_SQL, (address.lower(),))
 
-        migrations = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+            migrations = cursor.fetchall()
 
         return migrations
 
     def get_last_synced_block(self) -> int:
         """Get the last synced block number"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        cursor.execute("SELECT last_synced_block FROM sync_metadata WHERE id = 1")
-        result = cursor.fetchone()
-        conn.close()
+            cursor.execute(self._LAST_SYNCED_BLOCK_SQL)
+            result = cursor.fetchone()
 
         return result["last_synced_block"] if result else 0
 
     def update_sync_metadata(self, last_block: int):
         """Update sync metadata"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            UPDATE sync_metadata
-            SET last_synced_block = ?,
-                last_sync_time = CURRENT_TIMESTAMP
-            WHERE id = 1
-        """, (last_block,))
+            cursor.execute("""
+                UPDATE sync_metadata
+                SET last_synced_block = ?,
+                    last_sync_time = CURRENT_TIMESTAMP
+                WHERE id = 1
+            """, (last_block,))
+
+            conn.commit()
+
+    def get_deployment_block(self, contract_address: str) -> Optional[int]:
+        """Get the cached deployment block of a contract, if known"""
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT deployment_block FROM sync_metadata
+                WHERE id = 1 AND deployment_contract = ?
+            """, (contract_address.lower(),))
+            result = cursor.fetchone()
+
+        return result["deployment_block"] if result else None
+
+    def set_deployment_block(self, contract_address: str, block_number: int):
+        """Cache the deployment block of a contract"""
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        conn.commit()
-        conn.close()
+            cursor.execute("""
+                UPDATE sync_metadata
+                SET deployment_block = ?,
+                    deployment_contract = ?
+                WHERE id = 1
+            """, (block_number, contract_address.lower()))
+
+            conn.commit()
 
     def get_statistics(self) -> Dict:
         """Get migration statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            stats = self._query_statistics(conn.cursor())
 
-        # Total migrations
-        cursor.execute("SELECT COUNT(*) as total FROM migrations")
-        total_migrations = cursor.fetchone()["total"]
+        return stats
 
-        # Total PAL migrated
-        cursor.execute("SELECT SUM(amount_pal) as total FROM migrations")
-        total_pal = cursor.fetchone()["total"] or 0
+    def _query_statistics(self, cursor) -> Dict:
+        """Run the statistics queries on an open cursor"""
+        # Totals are maintained in sync_metadata by the insert methods
+        cursor.execute("""
+            SELECT total_migrations, total_pal_migrated
+            FROM sync_metadata
+            WHERE id = 1
+        """)
+        totals = cursor.fetchone()
+        total_migrations = totals["total_migrations"] or 0
+        total_pal = totals["total_pal_migrated"] or 0
+        avg_migration = total_pal / total_migrations if total_migrations else 0
 
         # Unique addresses
         cursor.execute("SELECT COUNT(DISTINCT from_address) as total FROM migrations")
         unique_addresses = cursor.fetchone()["total"]
 
-        # Average migration size
-        cursor.execute("SELECT AVG(amount_pal) as avg FROM migrations")
-        avg_migration = cursor.fetchone()["avg"] or 0
-
         # Median migration size (approximation)
         cursor.execute("""
             SELECT amount_pal FROM migrations
             ORDER BY amount_pal
-            LIMIT 1 OFFSET (SELECT COUNT(*) FROM migrations) / 2
-        """)
+            LIMIT 1 OFFSET ?
+        """, (total_migrations // 2,))
         median_result = cursor.fetchone()
         median_migration = median_result["amount_pal"] if median_result else 0
 
@@ -273,8 +503,6 @@ class MigrationDatabase:
         """)
         source_distribution = [dict(row) for row in cursor.fetchall()]
 
-        conn.close()
-
         return {
             "total_migrations": total_migrations,
             "total_pal_migrated": total_pal,
@@ -287,9 +515,14 @@ class MigrationDatabase:
 
     def get_daily_stats(self) -> List[Dict]:
         """Get daily migration statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            stats = self._query_daily_stats(conn.cursor())
+
+        return stats
 
+    def _query_daily_stats(self, cursor) -> List[Dict]:
+        """Run the daily statistics query on an open cursor"""
         cursor.execute("""
             SELECT
                 DATE(timestamp) as date,
@@ -302,51 +535,78 @@ class MigrationDatabase:
             ORDER BY date ASC
         """)
 
-        stats = [dict(row) for row in cursor.fetchall()]
-        conn.close()
+        return [dict(row) for row in cursor.fetchall()]
 
-        return stats
+    def get_bundle(self) -> Dict:
+        """
+        Get everything the dashboard metrics need in one round-trip
+
+        Statistics, daily stats and the migration amounts used for the size
+        distribution are read together in one locked pass, instead of one
+        call (and one full row fetch) per query.
+        """
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
+
+            statistics = self._query_statistics(cursor)
+            daily_stats = self._query_daily_stats(cursor)
+
+            cursor.execute("SELECT amount_pal FROM migrations")
+            amounts = [row[0] for row in cursor.fetchall()]
+
+        return {
+            "statistics": statistics,
+            "daily_stats": daily_stats,
+            "amounts": amounts
+        }
 
     def save_daily_snapshot(self):
         """Save a daily snapshot of current statistics"""
         stats = self.get_statistics()
 
-        conn = self.get_connection()
-        cursor = conn.cursor()
+        with self._lock:
+            conn = self.get_connection()
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO daily_snapshots
-            (snapshot_date, total_migrations, total_pal_migrated,
-             unique_addresses, average_migration_size, median_migration_size)
-            VALUES (DATE('now'), ?, ?, ?, ?, ?)
-        """, (
-            stats["total_migrations"],
-            stats["total_pal_migrated"],
-            stats["unique_addresses"],
-            stats["average_migration_size"],
-            stats["median_migration_size"]
-        ))
-
-        conn.commit()
-        conn.close()
+            cursor.execute("""
+                INSERT OR REPLACE INTO daily_snapshots
+                (snapshot_date, total_migrations, total_pal_migrated,
+                 unique_addresses, average_migration_size, median_migration_size)
+                VALUES (DATE('now'), ?, ?, ?, ?, ?)
+            """, (
+                stats["total_migrations"],
+                stats["total_pal_migrated"],
+                stats["unique_addresses"],
+                stats["average_migration_size"],
+                stats["median_migration_size"]
+            ))
+
+            conn.commit()
 
     def export_to_json(self, filepath: str):
         """Export all migrations to JSON file"""
-        migrations = self.get_all_migrations()
-
+        # Write the array one row at a time instead of materializing every migration
         with open(filepath, 'w') as f:
-            json.dump(migrations, f, indent=2, default=str)
+            f.write("[")
+            for i, migration in enumerate(self.iter_migrations()):
+                f.write(",\n" if i else "\n")
+                f.write(json.dumps(dict(migration), default=str))
+            f.write("\n]\n")
 
     def export_to_csv(self, filepath: str):
         """Export all migrations to CSV file"""
         import csv
 
-        migrations = self.get_all_migrations()
+        migrations = self.iter_migrations()
+        first = next(migrations, None)
 
-        if not migrations:
+        if first is None:
             return
 
+        # Rows are already in column order, so write them as plain sequences
         with open(filepath, 'w', newline='') as f:
-            writer = csv.DictWriter(f, fieldnames=migrations[0].keys())
-            writer.writeheader()
+            writer = csv.writer(f)
+            writer.writerow(first.keys())
+            writer.writerow(first)
             writer.writerows(migrations)
@@ -4,9 +4,11 @@ Demo Data Generator for Testing the Dashboard
 Creates sample migration data to test the dashboard without waiting for real migrations
 """
 
+import os
 import random
 from datetime import datetime, timedelta
 from database import MigrationDatabase
+from data_processor import MigrationDataProcessor
 
 
 def generate_demo_data(num_migrations=200, num_addresses=50):
@@ -22,51 +24,42 @@ def generate_demo_data(num_migrations=200, num_addresses=50):
     db = MigrationDatabase()
 
     # Generate random addresses
-    addresses = [
-        f"0x{''.join(random.choices('0123456789abcdef', k=40))}"
-        for _ in range(num_addresses)
-    ]
+    addresses = ["0x" + os.urandom(20).hex() for _ in range(num_addresses)]
 
     # Base timestamp (30 days ago)
     base_time = datetime.now() - timedelta(days=30)
 
-    migrations = []
-
-    for i in range(num_migrations):
-        # Random address (some addresses migrate multiple times)
-        from_address = random.choice(addresses)
+    # Draw every random column in one call each instead of once per migration
+    from_addresses = random.choices(addresses, k=num_migrations)  # Some addresses migrate multiple times
+    amounts_pal = [random.lognormvariate(8, 2) for _ in range(num_migrations)]  # Mean ~3000 PAL, varied distribution
+    minute_offsets = random.choices(range(31 * 24 * 60), k=num_migrations)  # Spread over 30 days
+    block_steps = random.choices(range(1, 101), k=num_migrations)
+    sources = random.choices(
+        ['sonic', 'ethereum', 'unknown'],
+        weights=[0.6, 0.3, 0.1],  # 60% Sonic, 30% Ethereum, 10% Unknown
+        k=num_migrations
+    )
 
-        # Random amount (log-normal distribution for realistic migration sizes)
-        amount_pal = random.lognormvariate(8, 2)  # Mean ~3000 PAL, varied distribution
+    migrations = []
 
-        # Random timestamp (spread over 30 days)
-        timestamp = base_time + timedelta(
-            days=random.randint(0, 30),
-            hours=random.randint(0, 23),
-            minutes=random.randint(0, 59)
-        )
+    for i, (from_address, amount_pal, minutes, step, source) in enumerate(
+        zip(from_addresses, amounts_pal, minute_offsets, block_steps, sources)
+    ):
+        timestamp = base_time + timedelta(minutes=minutes)
 
         # Random block number
-        block_number = 49997769 + i * random.randint(1, 100)
+        block_number = 49997769 + i * step
 
-        # Random source
-        source = random.choices(
-            ['sonic', 'ethereum', 'unknown'],
-            weights=[0.6, 0.3, 0.1]  # 60% Sonic, 30% Ethereum, 10% Unknown
-        )[0]
-
-        # Cap amount to avoid SQLite integer overflow (max safe: 2^63-1)
-        amount_wei = min(int(amount_pal * 10**18), 2**63 - 1)
+        amount_wei = int(amount_pal * 10**18)
 
         migration = {
-            "tx_hash": f"0x{''.join(random.choices('0123456789abcdef', k=64))}",
+            "tx_hash": "0x" + os.urandom(32).hex(),
             "from_address": from_address,
             "to_address": "0x99fe40e501151e92f10ac13ea1c06083ee170363",
             "amount": amount_wei,
             "amount_pal": amount_pal,
             "block_number": block_number,
             "block_timestamp": int(timestamp.timestamp()),
-            "timestamp": timestamp,
             "log_index": i,
             "source": source
         }
@@ -74,7 +67,7 @@ def generate_demo_data(num_migrations=200, num_addresses=50):
         migrations.append(migration)
 
     # Sort by timestamp
-    migrations.sort(key=lambda x: x["timestamp"])
+    migrations.sort(key=lambda x: x["block_timestamp"])
 
     # Insert into database
     print("Inserting demo data into database...")
@@ -86,6 +79,7 @@ def generate_demo_data(num_migrations=200, num_addresses=50):
 
     # Save snapshot
     db.save_daily_snapshot()
+    MigrationDataProcessor(db).write_metrics_snapshot()
 
     # Print statistics
     stats = db.get_statistics()
@@ -109,19 +103,16 @@ def generate_demo_data(num_migrations=200, num_addresses=50):
 
 def clear_database():
     """Clear all data from the database"""
-    import os
-    from config import DB_PATH
-
-    db_file = DB_PATH
-    if os.path.exists(db_file):
-        os.remove(db_file)
-        print(f"Deleted database: {db_file}")
-    else:
-        print(f"Database file not found: {db_file}")
+    from config import DB_PATH, METRICS_SNAPSHOT_PATH
 
-    # Reinitialize
     db = MigrationDatabase()
-    print("Database reinitialized")
+    db.clear()
+    print(f"Cleared database: {DB_PATH}")
+
+    # The API serves this file while it exists, so drop the stale metrics
+    if os.path.exists(METRICS_SNAPSHOT_PATH):
+        os.remove(METRICS_SNAPSHOT_PATH)
+        print(f"Deleted metrics snapshot: {METRICS_SNAPSHOT_PATH}")
 
 
 if __name__ == "__main__":
@@ -3,14 +3,23 @@ Migration Tracker - Fetches and processes PAL to TREVEE migration data
 """
 
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import List, Dict, Tuple, Optional
+from typing import Iterator, List, Dict, Tuple, Optional
 from rpc_client import SonicRPCClient
+from rate_limit import TokenBucket
 from config import (
     MIGRATION_CONTRACT_ADDRESS,
     PAL_TOKEN_ADDRESS,
     START_BLOCK,
-    BATCH_SIZE
+    BATCH_SIZE,
+    BLOCK_CHUNK_SIZE,
+    RPC_BATCH_SIZE,
+    LOG_FETCH_WORKERS,
+    SYNC_CHUNK_WORKERS,
+    MAX_RETRIES,
+    RETRY_DELAY
 )
 
 
@@ -20,8 +29,16 @@ class MigrationTracker:
     # ERC20 Transfer event signature
     TRANSFER_EVENT_SIGNATURE = "0xddf252ad1be2c89b69c2b068fc378daa952ba7f163c4a11628f55a4df523b3ef"
 
-    def __init__(self):
-        self.rpc = SonicRPCClient()
+    # Event signatures that mark a migration as coming through the Ethereum bridge
+    BRIDGE_SIGNATURES = frozenset({
+        "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925",  # Approval
+        "0x2849b43074093a05396b6f2a937dee8565e4a0d1a0033ea7a8a6c568b5da1a30",  # Bridge event
+    })
+
+    def __init__(self, rate_limiter: Optional[TokenBucket] = None):
+        self.rpc = SonicRPCClient(rate_limiter=rate_limiter)
+        # Indexed 'to' topic for the migration contract, used by every log query
+        self._migration_topic = self._address_to_topic(MIGRATION_CONTRACT_ADDRESS)
 
     def get_migration_events(self, from_block: int, to_block: Optional[int] = None) -> List[Dict]:
         """
@@ -39,43 +56,97 @@ class MigrationTracker:
 
         print(f"Scanning blocks {from_block} to {to_block}...")
 
+        ranges = [
+            (start, min(start + BATCH_SIZE - 1, to_block))
+            for start in range(from_block, to_block + 1, BATCH_SIZE)
+        ]
+
+        # eth_getLogs is network-bound, so overlap the batch requests;
+        # the pool size also caps how many are in flight at once
+        with ThreadPoolExecutor(max_workers=LOG_FETCH_WORKERS) as executor:
+            all_logs = [log for logs in executor.map(self._fetch_logs_range, ranges) for log in logs]
+
+        # Fetch timestamps for every block with an event at once
+        block_timestamps = self._fetch_block_timestamps(
+            {int(log.get("blockNumber", "0x0"), 16) for log in all_logs}
+        )
+
         all_events = []
-        current_block = from_block
+        for log in all_logs:
+            event = self._parse_transfer_event(log, block_timestamps)
+            if event:
+                all_events.append(event)
 
-        while current_block <= to_block:
-            batch_end = min(current_block + BATCH_SIZE - 1, to_block)
+        return all_events
 
-            print(f"Fetching logs from block {current_block} to {batch_end}...")
+    def iter_migration_events(self, from_block: int, to_block: int,
+                              chunk_size: int = BLOCK_CHUNK_SIZE) -> Iterator[Tuple[int, int, List[Dict]]]:
+        """
+        Fetch migration events chunk by chunk, in block order
 
-            try:
-                # Get Transfer events where 'to' address is the migration contract
-                # Topics: [0] = Transfer signature, [1] = from address, [2] = to address
-                logs = self.rpc.get_logs(
-                    from_block=current_block,
-                    to_block=batch_end,
-                    address=PAL_TOKEN_ADDRESS,
-                    topics=[
-                        self.TRANSFER_EVENT_SIGNATURE,
-                        None,  # Any sender
-                        self._address_to_topic(MIGRATION_CONTRACT_ADDRESS)  # To migration contract
-                    ]
-                )
+        Up to 2 * SYNC_CHUNK_WORKERS chunks are fetched ahead in parallel, so
+        only a bounded number of chunks are held in memory at once. If a
+        chunk's fetch fails, the error is raised when that chunk is reached
+        and the chunks fetched ahead of it are cancelled.
 
-                print(f"Found {len(logs)} transfer events in this batch")
+        Yields:
+            (chunk_start, chunk_end, events) for every chunk, including empty ones
+        """
+        chunks = iter([
+            (chunk_start, min(chunk_start + chunk_size - 1, to_block))
+            for chunk_start in range(from_block, to_block + 1, chunk_size)
+        ])
 
-                # Process each log
-                for log in logs:
-                    event = self._parse_transfer_event(log)
-                    if event:
-                        all_events.append(event)
+        with ThreadPoolExecutor(max_workers=SYNC_CHUNK_WORKERS) as executor:
+            pending = deque()
 
-            except Exception as e:
-                print(f"Error fetching logs for blocks {current_block}-{batch_end}: {e}")
+            def submit_next():
+                chunk = next(chunks, None)
+                if chunk:
+                    pending.append((chunk, executor.submit(self.get_migration_events, *chunk)))
 
-            current_block = batch_end + 1
-            time.sleep(0.1)  # Rate limiting
+            for _ in range(SYNC_CHUNK_WORKERS * 2):
+                submit_next()
 
-        return all_events
+            try:
+                # Chunks are submitted in order, so draining the FIFO keeps block order
+                while pending:
+                    (chunk_start, chunk_end), future = pending.popleft()
+                    events = future.result()
+                    submit_next()
+
+                    yield chunk_start, chunk_end, events
+            finally:
+                # Don't wait on prefetched chunks nobody will consume
+                for _, future in pending:
+                    future.cancel()
+
+    def _fetch_logs_range(self, block_range: Tuple[int, int]) -> List[Dict]:
+        """Fetch migration Transfer logs for one (from_block, to_block) range"""
+        start, end = block_range
+        print(f"Fetching logs from block {start} to {end}...")
+
+        try:
+            # Get Transfer events where 'to' address is the migration contract
+            # Topics: [0] = Transfer signature, [1] = from address, [2] = to address
+            logs = self.rpc.get_logs(
+                from_block=start,
+                to_block=end,
+                address=PAL_TOKEN_ADDRESS,
+                topics=[
+                    self.TRANSFER_EVENT_SIGNATURE,
+                    None,  # Any sender
+                    self._migration_topic  # To migration contract
+                ]
+            )
+        except Exception as e:
+            # Re-raise: an empty result would look like a range with no
+            # migrations, and the sync would checkpoint past it
+            print(f"Error fetching logs for blocks {start}-{end}: {e}")
+            raise
+
+        print(f"Found {len(logs)} transfer events in blocks {start}-{end}")
+        return logs
 
     def _address_to_topic(self, address: str) -> str:
         """Convert address to indexed topic format (32 bytes padded)"""
@@ -84,7 +155,45 @@ class MigrationTracker:
         # Pad to 64 characters (32 bytes)
         return "0x" + addr.zfill(64)
 
-    def _parse_transfer_event(self, log: Dict) -> Optional[Dict]:
+    def _fetch_block_timestamps(self, block_numbers) -> Dict[int, int]:
+        """Fetch block timestamps using batched eth_getBlockByNumber calls"""
+        timestamps = {}
+        block_numbers = sorted(block_numbers)
+
+        # Events stored without a timestamp would never be revisited, so blocks
+        # that fail inside a batch (e.g. rate limited) are requested again and
+        # any that still fail raise instead of being skipped
+        for attempt in range(MAX_RETRIES):
+            failed = []
+
+            for i in range(0, len(block_numbers), RPC_BATCH_SIZE):
+                chunk = block_numbers[i:i + RPC_BATCH_SIZE]
+
+                try:
+                    blocks = self.rpc.batch_request(
+                        [("eth_getBlockByNumber", [hex(n), False]) for n in chunk]
+                    )
+                except Exception as e:
+                    print(f"Could not fetch block timestamps: {e}")
+                    raise
+
+                for block_number, block in zip(chunk, blocks):
+                    if block and block.get("timestamp"):
+                        timestamps[block_number] = int(block["timestamp"], 16)
+                    else:
+                        failed.append(block_number)
+
+            if not failed:
+                return timestamps
+
+            block_numbers = failed
+            if attempt < MAX_RETRIES - 1:
+                print(f"No timestamp for {len(failed)} blocks (attempt {attempt + 1}/{MAX_RETRIES}), retrying...")
+                time.sleep(RETRY_DELAY)
+
+        raise Exception(f"Could not fetch timestamps for {len(block_numbers)} blocks, first {block_numbers[0]}")
+
+    def _parse_transfer_event(self, log: Dict, block_timestamps: Dict[int, int]) -> Optional[Dict]:
         """Parse a Transfer event log into structured data"""
         try:
             topics = log.get("topics", [])
@@ -107,14 +216,8 @@ class MigrationTracker:
             block_number = int(log.get("blockNumber", "0x0"), 16)
             tx_hash = log.get("transactionHash", "")
 
-            # Get block timestamp
-            block_timestamp = None
-            try:
-                block = self.rpc.get_block_by_number(block_number, False)
-                if block:
-                    block_timestamp = int(block.get("timestamp", "0x0"), 16)
-            except Exception as e:
-                print(f"Could not fetch block timestamp: {e}")
+            # Block timestamp (fetched in batch by the caller)
+            block_timestamp = block_timestamps.get(block_number)
 
             return {
                 "from_address": from_address.lower() if from_address else None,
@@ -123,7 +226,6 @@ class MigrationTracker:
                 "amount_pal": amount_pal,
                 "block_number": block_number,
                 "block_timestamp": block_timestamp,
-                "timestamp": datetime.fromtimestamp(block_timestamp) if block_timestamp else None,
                 "tx_hash": tx_hash,
                 "log_index": int(log.get("logIndex", "0x0"), 16)
             }
@@ -159,8 +261,10 @@ class MigrationTracker:
                     # Contract doesn't exist, search later
                     left = mid + 1
             except Exception as e:
+                # A partial search only gives an upper bound, which is not
+                # safe to start a sync from (or to cache)
                 print(f"Error checking block {mid}: {e}")
-                break
+                raise
 
         print(f"Migration contract deployed at block: {deployment_block}")
         return deployment_block
@@ -203,26 +307,52 @@ class MigrationTracker:
             tx = self.rpc.get_transaction_by_hash(tx_hash)
             receipt = self.rpc.get_transaction_receipt(tx_hash)
 
-            if not tx or not receipt:
+            if not tx:
                 return "unknown"
 
-            # Check transaction logs for bridge-related events
-            logs = receipt.get("logs", [])
+            return self._classify_receipt(receipt)
 
-            # Look for bridge-related event signatures
-            bridge_signatures = [
-                "0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925",  # Approval
-                "0x2849b43074093a05396b6f2a937dee8565e4a0d1a0033ea7a8a6c568b5da1a30",  # Bridge event
-            ]
+        except Exception as e:
+            print(f"Error analyzing transaction source: {e}")
+            return "unknown"
+
+    def analyze_transaction_sources_batch(self, tx_hashes: List[str]) -> List[str]:
+        """
+        Analyze the source of many migrations using batched receipt lookups
 
-            for log in logs:
-                topics = log.get("topics", [])
-                if topics and topics[0] in bridge_signatures:
-                    return "ethereum"
+        Returns: "sonic", "ethereum" or "unknown" for each hash, in input order
+        """
+        sources = []
 
-            # If no bridge signatures found, likely Sonic native
-            return "sonic"
+        for i in range(0, len(tx_hashes), RPC_BATCH_SIZE):
+            chunk = tx_hashes[i:i + RPC_BATCH_SIZE]
 
-        except Exception as e:
-            print(f"Error analyzing transaction source: {e}")
+            try:
+                receipts = self.rpc.batch_request(
+                    [("eth_getTransactionReceipt", [tx_hash]) for tx_hash in chunk]
+                )
+            except Exception as e:
+                print(f"Error analyzing transaction sources: {e}")
+                sources.extend(["unknown"] * len(chunk))
+                continue
+
+            sources.extend(self._classify_receipt(receipt) for receipt in receipts)
+
+        return sources
+
+    def _classify_receipt(self, receipt: Optional[Dict]) -> str:
+        """Classify a transaction receipt by the events it emitted"""
+        if not receipt:
             return "unknown"
+
+        # Check transaction logs for bridge-related events
+        logs = receipt.get("logs", [])
+
+        # Look for bridge-related event signatures
+        for log in logs:
+            topics = log.get("topics", [])
+            if topics and topics[0] in self.BRIDGE_SIGNATURES:
+                return "ethereum"
+
+        # If no bridge signatures found, likely Sonic native
+        return "sonic"
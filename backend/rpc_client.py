@@ -2,19 +2,55 @@
 RPC Client for interacting with Sonic blockchain
 """
 
+import orjson
 import requests
 import time
-from typing import Dict, List, Optional, Any
-from config import SONIC_RPC_URL, MAX_RETRIES, RETRY_DELAY
+from typing import Dict, List, Optional, Any, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import SONIC_RPC_URL, MAX_RETRIES, RETRY_DELAY, RPC_POOL_SIZE
+from rate_limit import TokenBucket
 
 
 class SonicRPCClient:
     """Client for interacting with Sonic blockchain via JSON-RPC"""
 
-    def __init__(self, rpc_url: str = SONIC_RPC_URL):
+    def __init__(self, rpc_url: str = SONIC_RPC_URL, rate_limiter: Optional[TokenBucket] = None):
         self.rpc_url = rpc_url
+        self.rate_limiter = rate_limiter
         self.session = requests.Session()
 
+        # Keep connections alive across calls and let urllib3 retry transient
+        # HTTP failures with a short backoff (JSON-RPC reads are idempotent).
+        # All traffic goes to one host, sized so no concurrent request has to
+        # open (and then drop) a connection outside the pool
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=RPC_POOL_SIZE,
+            max_retries=Retry(
+                total=MAX_RETRIES,
+                backoff_factor=0.2,
+                status_forcelist=[429, 502, 503, 504],
+                allowed_methods=frozenset(["POST"])
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _post(self, payload: Any) -> Any:
+        """POST a JSON-RPC payload and return the decoded response (via orjson)"""
+        if self.rate_limiter:
+            self.rate_limiter.acquire()
+
+        response = self.session.post(
+            self.rpc_url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=30
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
+
     def _make_request(self, method: str, params: List[Any]) -> Dict:
         """Make a JSON-RPC request with retry logic"""
         payload = {
@@ -24,27 +60,57 @@ class SonicRPCClient:
             "id": 1
         }
 
+        # Transport errors are already retried by the HTTP adapter; only
+        # RPC-level errors reported by the node are retried here
         for attempt in range(MAX_RETRIES):
-            try:
-                response = self.session.post(
-                    self.rpc_url,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=30
-                )
-                response.raise_for_status()
-                result = response.json()
-
-                if "error" in result:
-                    raise Exception(f"RPC Error: {result['error']}")
+            result = self._post(payload)
 
+            if "error" not in result:
                 return result.get("result")
 
-            except Exception as e:
-                if attempt == MAX_RETRIES - 1:
-                    raise
-                print(f"Request failed (attempt {attempt + 1}/{MAX_RETRIES}): {e}")
-                time.sleep(RETRY_DELAY)
+            if attempt == MAX_RETRIES - 1:
+                raise Exception(f"RPC Error: {result['error']}")
+            print(f"Request failed (attempt {attempt + 1}/{MAX_RETRIES}): RPC Error: {result['error']}")
+            time.sleep(RETRY_DELAY)
+
+    def batch_request(self, calls: List[Tuple[str, List[Any]]]) -> List[Any]:
+        """
+        Make several JSON-RPC calls in a single HTTP request
+
+        Args:
+            calls: List of (method, params) tuples
+
+        Returns:
+            Results in the same order as calls (None for calls that returned an error)
+        """
+        if not calls:
+            return []
+
+        payload = [
+            {"jsonrpc": "2.0", "method": method, "params": params, "id": i}
+            for i, (method, params) in enumerate(calls)
+        ]
+
+        for attempt in range(MAX_RETRIES):
+            result = self._post(payload)
+
+            # Responses may arrive in any order; match them up by id
+            if isinstance(result, list):
+                results = [None] * len(calls)
+                for item in result:
+                    if "error" in item:
+                        print(f"RPC Error in batch call {item.get('id')}: {item['error']}")
+                        continue
+                    results[item["id"]] = item.get("result")
+
+                return results
+
+            # A rejected batch comes back as a single error object
+            error = result.get("error", result)
+            if attempt == MAX_RETRIES - 1:
+                raise Exception(f"RPC Error: {error}")
+            print(f"Batch request failed (attempt {attempt + 1}/{MAX_RETRIES}): RPC Error: {error}")
+            time.sleep(RETRY_DELAY)
 
     def get_block_number(self) -> int:
         """Get the latest block number"""
@@ -4,28 +4,94 @@ Main synchronization script for PAL to TREVEE migration tracker
 Fetches new migration data and updates the database
 """
 
+import logging
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from typing import Optional
 from migration_tracker import MigrationTracker
 from database import MigrationDatabase
-from config import START_BLOCK
+from data_processor import MigrationDataProcessor
+from rate_limit import TokenBucket
+from config import (
+    MIGRATION_CONTRACT_ADDRESS,
+    START_BLOCK,
+    REORG_SAFETY_BLOCKS,
+    SYNC_INTERVAL_MIN,
+    SYNC_INTERVAL_MAX,
+    SYNC_CATCH_UP_BLOCKS,
+    RPC_RATE_LIMIT,
+    RPC_BURST
+)
+
+logger = logging.getLogger(__name__)
+
+# Single worker so post-sync snapshots never overlap
+_snapshot_executor = ThreadPoolExecutor(max_workers=1)
+
+
+def _post_sync_tasks(db: MigrationDatabase):
+    """Save the daily snapshot, write the metrics snapshot and print a summary"""
+    try:
+        # Save daily snapshot
+        print("Saving daily snapshot...")
+        db.save_daily_snapshot()
+
+        # Precompute dashboard metrics for the API
+        print("Writing metrics snapshot...")
+        MigrationDataProcessor(db).write_metrics_snapshot()
+
+        # Print summary
+        stats = db.get_statistics()
+        print("\n" + "=" * 60)
+        print("MIGRATION SUMMARY")
+        print("=" * 60)
+        print(f"Total Unique Addresses: {stats['unique_addresses']:,}")
+        print(f"Total Migrations: {stats['total_migrations']:,}")
+        print(f"Total PAL Migrated: {stats['total_pal_migrated']:,.2f}")
+        print(f"Average Migration Size: {stats['average_migration_size']:,.2f} PAL")
+        print(f"Median Migration Size: {stats['median_migration_size']:,.2f} PAL")
+        print("=" * 60)
+
+        # Show top 5 migrations
+        if stats['top_migrations']:
+            print("\nTop 5 Largest Migrations:")
+            for i, migration in enumerate(stats['top_migrations'][:5], 1):
+                print(f"  {i}. {migration['amount_pal']:,.2f} PAL from {migration['from_address'][:10]}...")
+
+    except Exception:
+        logger.exception("Error during post-sync tasks")
 
 
-def sync_migrations(full_sync: bool = False):
+def _analyze_sources(tracker: MigrationTracker, events: list):
+    """Set each event's source from one batched receipt lookup"""
+    sources = tracker.analyze_transaction_sources_batch([event["tx_hash"] for event in events])
+    for event, source in zip(events, sources):
+        event["source"] = source
+
+
+def sync_migrations(full_sync: bool = False, db: Optional[MigrationDatabase] = None):
     """
     Sync migration data from blockchain
 
     Args:
         full_sync: If True, sync from START_BLOCK. If False, sync from last synced block.
+        db: Database to sync into, shared with the background post-sync tasks.
+            Continuous mode passes the same one every time so no connection
+            is left open per run. A new one is opened if not given.
+
+    Returns:
+        Tuple of (success, number of events found, number of blocks scanned)
     """
     print("=" * 60)
     print("PAL to TREVEE Migration Synchronization")
     print("=" * 60)
 
-    # Initialize tracker and database
-    tracker = MigrationTracker()
-    db = MigrationDatabase()
+    # Initialize tracker and database (every RPC request draws from one token bucket)
+    tracker = MigrationTracker(rate_limiter=TokenBucket(RPC_RATE_LIMIT, RPC_BURST))
+    if db is None:
+        db = MigrationDatabase()
 
     # Determine starting block
     if full_sync:
@@ -33,13 +99,19 @@ def sync_migrations(full_sync: bool = False):
         from_block = START_BLOCK
 
         # Try to find contract deployment block for efficiency
+        # (the binary search only runs once; the result is cached in the database)
         try:
-            deployment_block = tracker.get_contract_deployment_block()
+            deployment_block = db.get_deployment_block(MIGRATION_CONTRACT_ADDRESS)
+            if deployment_block is None:
+                deployment_block = tracker.get_contract_deployment_block()
+                if deployment_block > 0:
+                    db.set_deployment_block(MIGRATION_CONTRACT_ADDRESS, deployment_block)
+
             if deployment_block > from_block:
                 from_block = deployment_block
                 print(f"Starting from contract deployment block: {deployment_block}")
         except Exception as e:
-            print(f"Could not determine deployment block: {e}")
+            logger.warning("Could not determine deployment block: %s", e)
 
     else:
         last_synced = db.get_last_synced_block()
@@ -50,79 +122,98 @@ def sync_migrations(full_sync: bool = False):
     try:
         current_block = tracker.rpc.get_block_number()
         print(f"Current blockchain height: {current_block}")
+
+        # Leave the most recent blocks for the next sync in case they are reorganized
+        current_block -= REORG_SAFETY_BLOCKS
     except Exception as e:
-        print(f"Error getting current block: {e}")
-        return False
+        logger.error("Error getting current block: %s", e)
+        return False, 0, 0
 
     if from_block > current_block:
         print("Already up to date!")
-        return True
+        return True, 0, 0
 
-    print(f"\nScanning {current_block - from_block + 1} blocks for migrations...")
+    blocks_to_scan = current_block - from_block + 1
+    print(f"\nScanning {blocks_to_scan} blocks for migrations...")
 
-    # Fetch migration events
+    # Fetch and store migration events one chunk at a time, so memory stays
+    # bounded and an interrupted sync resumes from the last stored chunk
+    total_inserted = 0
     try:
         start_time = time.time()
-        events = tracker.get_migration_events(from_block, current_block)
-        elapsed = time.time() - start_time
-
-        print(f"\nFound {len(events)} migration events in {elapsed:.2f} seconds")
+        total_events = 0
+        sample_size = 50  # Analyze the first 50 transactions of this sync
+        sample_remaining = sample_size
+
+        def store_chunk(chunk_start, chunk_end, events, analysis):
+            """
+            Wait for a chunk's source analysis, then insert and checkpoint it
+
+            Only reached for fully fetched chunks; a failed insert raises
+            before the checkpoint is written.
+            """
+            if analysis:
+                analysis.result()
+
+            inserted = db.insert_migrations_batch(events) if events else 0
+            db.update_sync_metadata(chunk_end)
+            print(f"Synced blocks {chunk_start}-{chunk_end} ({len(events)} events)")
+            return inserted
+
+        # Pipeline the stages: while chunk N's sources are analyzed, chunk N-1 is
+        # stored and later chunks are prefetched. Chunks are still stored in block
+        # order, so the last synced block never skips past a gap
+        with ThreadPoolExecutor(max_workers=1) as analyze_pool:
+            previous = None
 
-        if not events:
-            print("No new migrations found.")
-            db.update_sync_metadata(current_block)
-            return True
+            try:
+                for chunk_start, chunk_end, events in tracker.iter_migration_events(from_block, current_block):
+                    analysis = None
+                    if events and sample_remaining > 0:
+                        # Analyze transaction sources (sample some to avoid too many RPC calls)
+                        sample = events[:sample_remaining]
+                        sample_remaining -= len(sample)
+                        analysis = analyze_pool.submit(_analyze_sources, tracker, sample)
+
+                    if previous:
+                        chunk, previous = previous, None
+                        total_inserted += store_chunk(*chunk)
+
+                    previous = (chunk_start, chunk_end, events, analysis)
+                    total_events += len(events)
+            finally:
+                # The last chunk was fetched in full even if a later fetch failed
+                # or the sync was interrupted; store it so the next sync resumes after it
+                if previous:
+                    total_inserted += store_chunk(*previous)
 
-        # Analyze transaction sources (sample some to avoid too many RPC calls)
-        print("\nAnalyzing transaction sources...")
-        sample_size = min(len(events), 50)  # Analyze first 50 transactions
-        for i, event in enumerate(events[:sample_size]):
-            if i % 10 == 0:
-                print(f"  Analyzed {i}/{sample_size} transactions...")
+        elapsed = time.time() - start_time
 
-            source = tracker.analyze_transaction_source(event["tx_hash"])
-            event["source"] = source
-            time.sleep(0.1)  # Rate limiting
+        print(f"\nFound {total_events} migration events in {elapsed:.2f} seconds")
 
-        print(f"  Analyzed {sample_size}/{len(events)} transactions")
+        if not total_events:
+            print("No new migrations found.")
+            return True, 0, blocks_to_scan
 
-        # Insert into database
-        print("\nInserting migrations into database...")
-        inserted = db.insert_migrations_batch(events)
-        print(f"Successfully inserted {inserted} migrations")
+        print(f"  Analyzed {sample_size - sample_remaining}/{total_events} transactions")
+        print(f"Successfully inserted {total_inserted} migrations")
 
-        # Update sync metadata
-        db.update_sync_metadata(current_block)
+        # Snapshot, metrics and summary don't affect the sync itself; run them
+        # in the background so the next sync (or the wait for it) can start
+        _snapshot_executor.submit(_post_sync_tasks, db)
 
-        # Save daily snapshot
-        print("Saving daily snapshot...")
-        db.save_daily_snapshot()
+        return True, total_events, blocks_to_scan
 
-        # Print summary
-        stats = db.get_statistics()
-        print("\n" + "=" * 60)
-        print("MIGRATION SUMMARY")
-        print("=" * 60)
-        print(f"Total Unique Addresses: {stats['unique_addresses']:,}")
-        print(f"Total Migrations: {stats['total_migrations']:,}")
-        print(f"Total PAL Migrated: {stats['total_pal_migrated']:,.2f}")
-        print(f"Average Migration Size: {stats['average_migration_size']:,.2f} PAL")
-        print(f"Median Migration Size: {stats['median_migration_size']:,.2f} PAL")
-        print("=" * 60)
+    except Exception:
+        logger.exception("Error during synchronization")
+        print(f"Sync stopped; the next sync resumes from block {db.get_last_synced_block() + 1}")
 
-        # Show top 5 migrations
-        if stats['top_migrations']:
-            print("\nTop 5 Largest Migrations:")
-            for i, migration in enumerate(stats['top_migrations'][:5], 1):
-                print(f"  {i}. {migration['amount_pal']:,.2f} PAL from {migration['from_address'][:10]}...")
+        # Chunks stored before the failure are not synced again, so refresh
+        # the snapshot and metrics for them now
+        if total_inserted:
+            _snapshot_executor.submit(_post_sync_tasks, db)
 
-        return True
-
-    except Exception as e:
-        print(f"\nError during synchronization: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+        return False, 0, 0
 
 
 def check_migration_deadline():
@@ -145,6 +236,8 @@ def main():
     """Main entry point"""
     import argparse
 
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
     parser = argparse.ArgumentParser(description="Sync PAL to TREVEE migration data")
     parser.add_argument(
         "--full",
@@ -159,7 +252,7 @@ def main():
     parser.add_argument(
         "--continuous",
         action="store_true",
-        help="Run continuous sync (every 5 minutes)"
+        help="Run continuous sync (every 1-10 minutes, adapting to migration activity)"
     )
 
     args = parser.parse_args()
@@ -170,14 +263,34 @@ def main():
 
     if args.continuous:
         print("Starting continuous sync mode (Ctrl+C to stop)...")
+        sleep_interval = 300  # Start at 5 minutes
+
+        # One connection for every run; its lock also keeps the background
+        # post-sync writes from contending with the next run's inserts
+        db = MigrationDatabase()
         while True:
             try:
-                sync_migrations(full_sync=False)
-                print(f"\nNext sync in 5 minutes... (Press Ctrl+C to stop)")
-                time.sleep(300)  # 5 minutes
+                ok, num_events, blocks_scanned = sync_migrations(full_sync=False, db=db)
+
+                # A long scan means the chain moved on meanwhile; catch up right away
+                if ok and blocks_scanned > SYNC_CATCH_UP_BLOCKS:
+                    print("\nStill catching up, syncing again immediately...")
+                    continue
+
+                # Poll faster while migrations are coming in, back off when quiet
+                if ok:
+                    factor = 0.5 if num_events else 2
+                    sleep_interval = min(max(sleep_interval * factor, SYNC_INTERVAL_MIN), SYNC_INTERVAL_MAX)
+
+                print(f"\nNext sync in {sleep_interval:.0f} seconds... (Press Ctrl+C to stop)")
+                time.sleep(sleep_interval)
             except KeyboardInterrupt:
                 print("\nStopping continuous sync...")
                 break
+
+        # Let a pending post-sync snapshot finish before closing its connection
+        _snapshot_executor.shutdown(wait=True)
+        db.close()
     else:
         sync_migrations(full_sync=args.full)
 
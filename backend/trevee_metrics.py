@@ -3,9 +3,20 @@ Trevee Multi-Chain Metrics Tracker
 Fetches TVL, holder count, and staking data across multiple chains
 """
 
+import logging
+import orjson
 import requests
-from typing import Dict, List, Optional
-from config import TREVEE_CHAINS, TREVEE_TOTAL_SUPPLY
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from config import TREVEE_CHAINS, TREVEE_TOTAL_SUPPLY, TREVEE_RPC_CACHE_TTL
+
+logger = logging.getLogger(__name__)
+
+# Placeholder used in TREVEE_CHAINS for contracts that are not deployed
+ZERO_ADDRESS = "0x0000000000000000000000000000000000000000"
 
 
 class TreveeMetricsTracker:
@@ -16,8 +27,70 @@ class TreveeMetricsTracker:
     BALANCE_OF_SELECTOR = "0x70a08231"    # balanceOf(address)
     DECIMALS_SELECTOR = "0x313ce567"       # decimals()
 
+    # Token amounts are assumed to use 18 decimals (standard for most tokens)
+    WEI_PER_ETHER = 10**18
+
     def __init__(self):
         self.chains = {k: v for k, v in TREVEE_CHAINS.items() if v.get("enabled", False)}
+        num_workers = max(len(self.chains), 1)
+
+        # Partition once so the per-refresh fan-outs only visit chains that
+        # have something to query: a deployed token (TVL) and, on top of
+        # that, a deployed staking contract (staking)
+        self._tvl_chains = [
+            chain_key for chain_key, chain_config in self.chains.items()
+            if chain_config["trevee_token"] != ZERO_ADDRESS
+        ]
+        self._staking_chains = [
+            chain_key for chain_key in self._tvl_chains
+            if self.chains[chain_key]["staking_contract"] != ZERO_ADDRESS
+        ]
+        for chain_key in self.chains.keys() - set(self._tvl_chains):
+            logger.warning("Trevee token address not configured for %s", chain_key)
+
+        # balanceOf(stakingContract) calldata for every staking chain
+        self._staked_calldata = {
+            chain_key: self._encode_balance_of(self.chains[chain_key]["staking_contract"])
+            for chain_key in self._staking_chains
+        }
+
+        # Recently fetched amounts: (chain_key, "supply" | "staked") -> (fetched_at, value)
+        self._cache: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._cache_ttl = TREVEE_RPC_CACHE_TTL
+
+        # Long-lived workers for the per-chain fan-out (one per chain), so
+        # each refresh reuses threads instead of spawning a new pool
+        self._executor = ThreadPoolExecutor(
+            max_workers=num_workers,
+            thread_name_prefix="trevee-rpc"
+        )
+
+        # One keep-alive pool per chain RPC, each large enough for every
+        # fan-out worker (one per chain) to hold a connection at once
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=num_workers,
+            pool_maxsize=num_workers,
+            max_retries=Retry(
+                total=2,
+                backoff_factor=0.3,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods=frozenset(["POST"])
+            )
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def _post_json(self, rpc_url: str, payload):
+        """POST a JSON-RPC payload, (de)serializing with orjson"""
+        response = self.session.post(
+            rpc_url,
+            data=orjson.dumps(payload),
+            headers={"Content-Type": "application/json"},
+            timeout=10
+        )
+        response.raise_for_status()
+        return orjson.loads(response.content)
 
     def _make_rpc_call(self, rpc_url: str, method: str, params: List) -> Optional[Dict]:
         """Make JSON-RPC call to blockchain"""
@@ -28,14 +101,114 @@ class TreveeMetricsTracker:
                 "params": params,
                 "id": 1
             }
-            response = requests.post(rpc_url, json=payload, timeout=10)
-            response.raise_for_status()
-            result = response.json()
+            result = self._post_json(rpc_url, payload)
             return result.get("result")
         except Exception as e:
-            print(f"RPC call failed for {rpc_url}: {e}")
+            logger.warning("RPC call failed for %s: %s", rpc_url, e)
             return None
 
+    def _cache_get(self, chain_key: str, kind: str) -> Optional[float]:
+        """Return a cached amount if it was fetched within the TTL"""
+        entry = self._cache.get((chain_key, kind))
+        if entry and time.monotonic() - entry[0] < self._cache_ttl:
+            return entry[1]
+        return None
+
+    def _cache_set(self, chain_key: str, kind: str, value: Optional[float]):
+        """Cache a successfully fetched amount"""
+        if value is not None:
+            self._cache[(chain_key, kind)] = (time.monotonic(), value)
+
+    @classmethod
+    def _encode_balance_of(cls, address: str) -> str:
+        """Encode balanceOf(address) calldata (address left-padded with 12 zero bytes)"""
+        return cls.BALANCE_OF_SELECTOR + bytes(12).hex() + address[2:].lower()
+
+    @staticmethod
+    def _decode_uint256(hex_result: str) -> int:
+        """Decode a hex-encoded uint256 eth_call result"""
+        digits = hex_result[2:] if hex_result.startswith("0x") else hex_result
+        if not digits:
+            raise ValueError("empty eth_call result")
+        if len(digits) % 2:
+            digits = "0" + digits
+        return int.from_bytes(bytes.fromhex(digits), "big")
+
+    def _batch_eth_call(self, rpc_url: str, calls: List[Tuple[str, str]]) -> List[Optional[str]]:
+        """
+        Make several eth_calls against one chain in a single JSON-RPC batch
+
+        Args:
+            rpc_url: Chain RPC endpoint
+            calls: List of (to, data) tuples
+
+        Returns:
+            Raw hex results in call order (None for failed calls)
+        """
+        payload = [
+            {
+                "jsonrpc": "2.0",
+                "method": "eth_call",
+                "params": [{"to": to, "data": data}, "latest"],
+                "id": i
+            }
+            for i, (to, data) in enumerate(calls)
+        ]
+
+        try:
+            result = self._post_json(rpc_url, payload)
+        except Exception as e:
+            logger.warning("Batch RPC call failed for %s: %s", rpc_url, e)
+            return [None] * len(calls)
+
+        # Some public RPCs reject batches; fall back to one call each
+        if not isinstance(result, list):
+            return [
+                self._make_rpc_call(rpc_url, "eth_call", [{"to": to, "data": data}, "latest"])
+                for to, data in calls
+            ]
+
+        results = [None] * len(calls)
+        for item in result:
+            if "error" in item:
+                logger.warning("RPC call failed for %s: %s", rpc_url, item["error"])
+                continue
+            results[item["id"]] = item.get("result")
+
+        return results
+
+    def _get_chain_amounts(self, chain_key: str) -> Tuple[Optional[float], Optional[float]]:
+        """Get (total supply, staked amount) for a chain with one batched RPC request"""
+        chain_config = self.chains[chain_key]
+        token_address = chain_config["trevee_token"]
+        staked_calldata = self._staked_calldata.get(chain_key)
+
+        supply = self._cache_get(chain_key, "supply")
+        staked = self._cache_get(chain_key, "staked")
+        if supply is not None and (staked is not None or staked_calldata is None):
+            return supply, staked
+
+        # totalSupply(), plus balanceOf(stakingContract) when staking is deployed
+        calls = [(token_address, self.TOTAL_SUPPLY_SELECTOR)]
+        if staked_calldata is not None:
+            calls.append((token_address, staked_calldata))
+
+        amounts = []
+        for result in self._batch_eth_call(chain_config["rpc_url"], calls):
+            amount = None
+            if result:
+                try:
+                    amount = self._decode_uint256(result) / self.WEI_PER_ETHER
+                except Exception as e:
+                    logger.warning("Error parsing eth_call result for %s: %s", chain_key, e)
+            amounts.append(amount)
+
+        supply = amounts[0]
+        staked = amounts[1] if len(amounts) > 1 else None
+        self._cache_set(chain_key, "supply", supply)
+        self._cache_set(chain_key, "staked", staked)
+        return supply, staked
+
     def get_token_total_supply(self, chain_key: str) -> Optional[float]:
         """Get total supply of Trevee token on a chain"""
         chain_config = self.chains.get(chain_key)
@@ -43,10 +216,14 @@ class TreveeMetricsTracker:
             return None
 
         token_address = chain_config["trevee_token"]
-        if token_address == "0x0000000000000000000000000000000000000000":
-            print(f"Warning: Trevee token address not configured for {chain_key}")
+        if token_address == ZERO_ADDRESS:
+            logger.warning("Trevee token address not configured for %s", chain_key)
             return None
 
+        cached = self._cache_get(chain_key, "supply")
+        if cached is not None:
+            return cached
+
         # Call totalSupply()
         result = self._make_rpc_call(
             chain_config["rpc_url"],
@@ -56,11 +233,11 @@ class TreveeMetricsTracker:
 
         if result:
             try:
-                supply_wei = int(result, 16)
-                # Assume 18 decimals (standard for most tokens)
-                return supply_wei / 10**18
+                supply = self._decode_uint256(result) / self.WEI_PER_ETHER
+                self._cache_set(chain_key, "supply", supply)
+                return supply
             except Exception as e:
-                print(f"Error parsing total supply: {e}")
+                logger.warning("Error parsing total supply: %s", e)
 
         return None
 
@@ -71,16 +248,16 @@ class TreveeMetricsTracker:
             return None
 
         token_address = chain_config["trevee_token"]
-        staking_contract = chain_config["staking_contract"]
 
-        if staking_contract == "0x0000000000000000000000000000000000000000":
-            print(f"Warning: Staking contract not configured for {chain_key}")
+        # Call balanceOf(stakingContract) on token contract
+        data = self._staked_calldata.get(chain_key)
+        if data is None:
+            logger.warning("Staking contract not configured for %s", chain_key)
             return None
 
-        # Call balanceOf(stakingContract) on token contract
-        # Pad address to 32 bytes (64 hex chars)
-        padded_address = staking_contract[2:].zfill(64)
-        data = self.BALANCE_OF_SELECTOR + padded_address
+        cached = self._cache_get(chain_key, "staked")
+        if cached is not None:
+            return cached
 
         result = self._make_rpc_call(
             chain_config["rpc_url"],
@@ -90,10 +267,11 @@ class TreveeMetricsTracker:
 
         if result:
             try:
-                staked_wei = int(result, 16)
-                return staked_wei / 10**18
+                staked = self._decode_uint256(result) / self.WEI_PER_ETHER
+                self._cache_set(chain_key, "staked", staked)
+                return staked
             except Exception as e:
-                print(f"Error parsing staked amount: {e}")
+                logger.warning("Error parsing staked amount: %s", e)
 
         return None
 
@@ -107,12 +285,6 @@ class TreveeMetricsTracker:
         # 1. Blockchain indexer API (like Covalent, Moralis)
         # 2. Block explorer API
         # 3. Custom event scanning (slow)
-
-        chain_config = self.chains.get(chain_key)
-        if not chain_config:
-            return None
-
-        print(f"Note: Holder count not yet implemented for {chain_key}")
         return None
 
     def get_tvl_by_chain(self) -> Dict[str, Dict]:
@@ -122,36 +294,45 @@ class TreveeMetricsTracker:
         Returns:
             Dict with chain data including supply (as proxy for TVL)
         """
+        # One batched request per chain, with the chains queried concurrently
+        amounts = dict(zip(self._tvl_chains, self._executor.map(self._get_chain_amounts, self._tvl_chains)))
+
         tvl_data = {}
 
         for chain_key, chain_config in self.chains.items():
-            supply = self.get_token_total_supply(chain_key)
-            staked = self.get_staked_amount(chain_key)
-            holders = self.get_holder_count_estimate(chain_key)
+            supply, staked = amounts.get(chain_key, (None, None))
 
             tvl_data[chain_key] = {
                 "name": chain_config["name"],
                 "chain_id": chain_config["chain_id"],
                 "total_supply": supply,
                 "staked_amount": staked,
-                "holder_count": holders,
+                "holder_count": self.get_holder_count_estimate(chain_key),
                 "explorer": chain_config["explorer"]
             }
 
         return tvl_data
 
-    def get_total_staking_percentage(self) -> Dict:
+    def get_total_staking_percentage(self, staked_by_chain: Optional[Dict[str, Optional[float]]] = None) -> Dict:
         """
         Calculate total staking percentage across all chains
 
+        Args:
+            staked_by_chain: Staked amounts already fetched per chain (fetched here if None)
+
         Returns:
             Dict with total staked amount and percentage
         """
+        if staked_by_chain is None:
+            staked_by_chain = dict(zip(
+                self._staking_chains,
+                self._executor.map(self.get_staked_amount, self._staking_chains)
+            ))
+
         total_staked = 0
         staking_by_chain = {}
 
-        for chain_key in self.chains.keys():
-            staked = self.get_staked_amount(chain_key)
+        for chain_key, staked in staked_by_chain.items():
             if staked:
                 total_staked += staked
                 staking_by_chain[chain_key] = staked
@@ -167,15 +348,24 @@ class TreveeMetricsTracker:
 
     def get_all_metrics(self) -> Dict:
         """Get all Trevee metrics in one call"""
+        tvl_by_chain = self.get_tvl_by_chain()
+
+        # Reuse the staked amounts fetched for the TVL breakdown
+        staked_by_chain = {
+            chain_key: data["staked_amount"] for chain_key, data in tvl_by_chain.items()
+        }
+
         return {
-            "tvl_by_chain": self.get_tvl_by_chain(),
-            "staking_stats": self.get_total_staking_percentage(),
+            "tvl_by_chain": tvl_by_chain,
+            "staking_stats": self.get_total_staking_percentage(staked_by_chain),
             "enabled_chains": list(self.chains.keys())
         }
 
 
 def main():
     """Test the metrics tracker"""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+
     tracker = TreveeMetricsTracker()
 
     print("=" * 60)
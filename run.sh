@@ -61,4 +61,4 @@ echo ""
 echo "Starting API server..."
 echo "(Press Ctrl+C to stop)"
 echo ""
-python3 api.py
+gunicorn -k gevent -w 4 --worker-connections 100 -b 0.0.0.0:5000 api:app